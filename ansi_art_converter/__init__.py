@@ -1,2 +1,3 @@
 from ansi_art_converter import AnsiArtConverter, TerminalScreen, DelayedPrinter
+from ansi_art_converter import ScreenCheckpoints, Pager
 from ansi_art_converter import main
@@ -10,7 +10,10 @@ import argparse
 import os
 import select
 import tty
+import termios
 import curses
+import bisect
+import json
 
 def main():
     logger = logging.getLogger(__name__)
@@ -31,19 +34,81 @@ def main():
                         default=64, help='Palette offset to use.')
     parser.add_argument('-d', '--delay', type=float,
                         default=0, help='Delay between printing each character.')
+    parser.add_argument('-s', '--start-offset', type=int,
+                        default=0, help='Input byte offset to start printing from.')
+    parser.add_argument('-r', '--start-row', type=int,
+                        default=0, help='Row of the art to start printing from.')
+    parser.add_argument('-i', '--index',
+                        help='File to keep screen state checkpoints of the input in '
+                        'for faster starting from an offset or row.')
+    parser.add_argument('-P', '--pager', action='store_true',
+                        help='Page through the art one screenful at a time.')
 
     args = parser.parse_args()
 
+    if args.pager and (args.start_offset or args.start_row or args.index):
+        parser.error("the pager can't be combined with a start offset, row or index")
+    if args.start_offset and args.start_row:
+        parser.error("only one of start offset and start row can be given")
+
     if not select.select([args.infile,],[],[],0.0)[0]:
         sys.stderr.write("Error: No input data.")
         return os.EX_DATAERR
 
+    # Resuming from a stored checkpoint needs to seek in the input.
+    if args.index:
+        try:
+            args.infile.tell()
+        except IOError:
+            sys.stderr.write("Error: Index requires a seekable input file.")
+            return os.EX_DATAERR
+
     logger.warn("converting from: {}".format(args.infile.name))
     image_writer = TerminalCommands(args.palette_offset)
     screen = TerminalScreen(image_writer, {'row': args.offset_row, 'col': args.offset_column})
+    checkpoints = None
+    if args.index:
+        size = os.fstat(args.infile.fileno()).st_size
+        checkpoints = ScreenCheckpoints()
+        if os.path.exists(args.index):
+            checkpoints.load(args.index, size)
     converter = AnsiArtConverter(args.infile, args.outfile, screen, image_writer,
-                                 args.palette_offset, args.delay)
-    converter.print_ansi()
+                                 args.palette_offset, args.delay, checkpoints)
+    if args.pager:
+        keys = sys.stdin
+        # Piped art leaves the terminal as the only source for keys.
+        if args.infile is sys.stdin:
+            keys = open('/dev/tty')
+        Pager(converter, args.outfile, keys).run()
+        return
+    row = None
+    if args.start_row:
+        row = args.offset_row + args.start_row - 1
+    converter.print_ansi(args.start_offset, row)
+    if checkpoints:
+        checkpoints.save(args.index, size)
+
+
+class CountingInput(object):
+    """Counts the bytes read so that piped input can report its offset."""
+
+    def __init__(self, stream):
+        """Wrap the stream that the ANSI art is read from."""
+        self._stream = stream
+        self._offset = 0
+
+    def read(self, size = -1):
+        data = self._stream.read(size)
+        self._offset += len(data)
+        return data
+
+    def tell(self):
+        return self._offset
+
+    def seek(self, offset):
+        """Moves to the offset, only possible when the stream is seekable."""
+        self._stream.seek(offset)
+        self._offset = offset
 
 
 class DelayedPrinter(object):
@@ -138,6 +203,22 @@ class TerminalCommands(object):
     def erase_line(self, args = []):
         return "\033[2K"
 
+    def scroll_up(self, args = [1]):
+        return "\033[{}S".format(args[0])
+
+    def scroll_down(self, args = [1]):
+        return "\033[{}T".format(args[0])
+
+    def scroll_region(self, top, bottom):
+        return "\033[{};{}r".format(top, bottom)
+
+    def reset_scroll_region(self, args = []):
+        return "\033[r"
+
+    def lines(self):
+        """Returns the height of the terminal."""
+        curses.setupterm()
+        return curses.tigetnum("lines")
 
     def cursor_position(self, row, column):
         return "\033[{};{}f".format(row, column)
@@ -187,6 +268,9 @@ class TerminalScreen(object):
         if 'rows' in dimensions:
             self.bounds['row'] = origin['row'] + dimensions['rows'] - 1
         self.image_writer = image_writer
+        self.color_chars = image_writer.color(self.current_color)
+        # Rows of printed cells, only kept when paging.
+        self.cells = None
 
 
     def current_color_debug(self):
@@ -234,6 +318,27 @@ class TerminalScreen(object):
                 return char + self.newline()
         return char
 
+    def store(self, char):
+        """Keeps a printed character and its color at the cursor position."""
+        if self.cells is None:
+            return
+        row = self.cursor['row'] - self.origin['row']
+        col = self.cursor['col'] - self.origin['col']
+        if row < 0 or col < 0:
+            return
+        while len(self.cells) <= row:
+            self.cells.append({})
+        self.cells[row][col] = (self.color_chars, char)
+
+    def clear_cells(self, row, first = 0, last = None):
+        """Forgets the kept cells of a row from column first up to last."""
+        if self.cells is None or not 0 <= row < len(self.cells):
+            return
+        cells = self.cells[row]
+        for col in list(cells.keys()):
+            if col >= first and (last is None or col <= last):
+                del cells[col]
+
     def down(self, rows):
         """Changes the tracked cursor position one row down."""
         self.cursor['row'] += rows[0]
@@ -288,9 +393,41 @@ class TerminalScreen(object):
         """Restores the tracked cursor position."""
         self.cursor = copy.deepcopy(self.saved_cursor)
 
+    def snapshot(self):
+        """Returns a copy of the tracked state needed to resume printing."""
+        return copy.deepcopy({
+            'cursor': self.cursor,
+            'saved_cursor': self.saved_cursor,
+            'current_color': self.current_color,
+            'max_row': self.max_row
+        })
+
+    def restore(self, snapshot):
+        """Restores the tracked state from a snapshot."""
+        self.cursor = copy.deepcopy(snapshot['cursor'])
+        self.saved_cursor = copy.deepcopy(snapshot['saved_cursor'])
+        self.current_color = copy.deepcopy(snapshot['current_color'])
+        self.max_row = snapshot['max_row']
+        self.color_chars = self.image_writer.color(self.current_color)
+
     def erase(self, arg):
-        """The erase screen command has no effect on cursor position."""
-        pass
+        """The erase screen command has no effect on cursor position.
+
+        The kept cells are cleared the same way as the terminal screen."""
+        if self.cells is None:
+            return
+        row = self.cursor['row'] - self.origin['row']
+        col = self.cursor['col'] - self.origin['col']
+        if arg[0] == 2:
+            first, last = 0, len(self.cells)
+        elif arg[0] == 1:
+            first, last = 0, row
+            self.clear_cells(row, 0, col)
+        else:
+            first, last = row + 1, len(self.cells)
+            self.clear_cells(row, col)
+        for index in range(max(first, 0), last):
+            self.clear_cells(index)
 
     def color(self, arg):
         """Sets the current tracked color as requested."""
@@ -300,6 +437,7 @@ class TerminalScreen(object):
         self.current_color = current
         self.logger.warn(self.current_color_debug())
         chars = self.image_writer.color(current)
+        self.color_chars = chars
         return chars
 
 
@@ -330,6 +468,7 @@ class TerminalScreen(object):
         return current
 
     def erase_line(self, args = []):
+        self.clear_cells(self.cursor['row'] - self.origin['row'])
         return self.default_color_wrap(self.image_writer.erase_line())
 
     def newline(self):
@@ -360,6 +499,261 @@ class TerminalScreen(object):
             if self.cursor['row'] > self.bounds['row']:
                 self.cursor['row'] -= 1
 
+        self.clear_cells(self.cursor['row'] - self.origin['row'],
+                         self.cursor['col'] - self.origin['col'],
+                         self.cursor['col'] - self.origin['col'])
+
+class ScreenCheckpoints(object):
+    """Index of screen state snapshots for seeking in the ANSI art.
+
+    A snapshot is recorded whenever the input has advanced by interval_bytes
+    or the art has grown by interval_rows since the previous one."""
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, interval_bytes = 4096, interval_rows = 0):
+        """Set the distance between checkpoints, zero disables a limit."""
+        self.interval_bytes = interval_bytes
+        self.interval_rows = interval_rows
+        self.offsets = []
+        self.rows = []
+        self.snapshots = []
+
+    def due(self, offset, screen):
+        """Tells whether a checkpoint should be recorded at offset."""
+        if not self.snapshots:
+            return True
+        last = self.snapshots[-1]
+        if self.interval_bytes and offset - last['offset'] >= self.interval_bytes:
+            return True
+        if self.interval_rows and screen.max_row - last['max_row'] >= self.interval_rows:
+            return True
+        return False
+
+    def record(self, offset, screen):
+        """Stores the screen state at offset if a checkpoint is due."""
+        # Offsets only grow during a single pass over the input.
+        if self.offsets and offset <= self.offsets[-1]:
+            return False
+        if not self.due(offset, screen):
+            return False
+        snapshot = screen.snapshot()
+        snapshot['offset'] = offset
+        self.offsets.append(offset)
+        self.rows.append(snapshot['max_row'])
+        self.snapshots.append(snapshot)
+        return True
+
+    def nearest(self, offset = None, row = None):
+        """Returns the last checkpoint at or before the offset or row.
+
+        For a row it is the last one taken before anything was drawn on it."""
+        if offset is not None:
+            index = bisect.bisect_right(self.offsets, offset) - 1
+        else:
+            index = bisect.bisect_left(self.rows, row) - 1
+            # The first checkpoint is taken before anything is drawn but its
+            # max_row already counts the first row.
+            if self.snapshots:
+                index = max(index, 0)
+        if index < 0:
+            return None
+        return self.snapshots[index]
+
+    def save(self, path, size):
+        """Writes the checkpoints of an input of size bytes in a file."""
+        with open(path, 'w') as index_file:
+            json.dump({
+                'size': size,
+                'interval_bytes': self.interval_bytes,
+                'interval_rows': self.interval_rows,
+                'snapshots': self.snapshots
+            }, index_file)
+
+    def load(self, path, size):
+        """Reads the checkpoints from a file if they match the input size."""
+        with open(path) as index_file:
+            index = json.load(index_file)
+        if index['size'] != size:
+            self.logger.warn("Ignoring index {} of a different input.".format(path))
+            return False
+        self.interval_bytes = index['interval_bytes']
+        self.interval_rows = index['interval_rows']
+        self.snapshots = index['snapshots']
+        self.offsets = [snapshot['offset'] for snapshot in self.snapshots]
+        self.rows = [snapshot['max_row'] for snapshot in self.snapshots]
+        return True
+
+
+class Pager(object):
+    """Shows the ANSI art one screenful at a time.
+
+    The whole art is processed into rows of cells first and only the rows
+    scrolling into the viewport are drawn afterwards."""
+
+    keys = {
+        'j': 'line_down',
+        '\033[B': 'line_down',
+        '\n': 'line_down',
+        'k': 'line_up',
+        '\033[A': 'line_up',
+        ' ': 'page_down',
+        'f': 'page_down',
+        '\033[6~': 'page_down',
+        'b': 'page_up',
+        '\033[5~': 'page_up',
+        'g': 'jump',
+        'G': 'bottom'
+    }
+
+    def __init__(self, converter, output = sys.stdout, input = sys.stdin):
+        """Initialise the injected attributes for Pager."""
+        self.converter = converter
+        self.screen = converter.screen
+        self.image_writer = converter.terminalcommands
+        self._output = output
+        self.input = input
+        self.top = 0
+        self.count = ''
+        # The last line of the terminal is left for the status line.
+        self.status_row = self.image_writer.lines()
+        self.height = max(self.status_row - self.screen.origin['row'], 1)
+        self.blank = self.image_writer.color(self.screen.default_color)
+
+    def run(self):
+        """Processes the art and pages through it until quit."""
+        self.screen.cells = []
+        self.converter.process_silently()
+        self.cells = self.screen.cells
+
+        output = self.converter.prepare_screen()
+        output += self.image_writer.scroll_region(self.screen.origin['row'],
+                                                  self.status_row - 1)
+        mode = termios.tcgetattr(self.input.fileno())
+        try:
+            self._output.write(output + self.draw(0, self.height))
+            self._output.flush()
+
+            tty.setcbreak(self.input.fileno())
+            while True:
+                key = self.read_key()
+                # End of input or quit.
+                if key in ('', 'q'):
+                    break
+                if key.isdigit():
+                    self.count += key
+                    continue
+                if key in self.keys:
+                    self._output.write(getattr(self, self.keys[key])())
+                    self._output.flush()
+                self.count = ''
+        finally:
+            termios.tcsetattr(self.input.fileno(), termios.TCSAFLUSH, mode)
+            output = self.image_writer.reset_scroll_region()
+            output += self.blank
+            output += self.image_writer.cursor_position(self.status_row, 1)
+            output += self.image_writer.show_cursor()
+            self._output.write(output)
+            self._output.flush()
+
+    def read_key(self):
+        """Reads a key press including the CSI sequences of special keys."""
+        # Unbuffered reads keep the rest of a sequence visible to select.
+        fileno = self.input.fileno()
+        key = os.read(fileno, 1)
+        if key != '\033':
+            return key
+        # A bare Esc is not followed by anything right away.
+        if not select.select([fileno], [], [], 0.05)[0]:
+            return key
+        key += os.read(fileno, 1)
+        if key[1:] != '[':
+            return key
+        while True:
+            character = os.read(fileno, 1)
+            key += character
+            # command character in CSI sequence is in this range.
+            if not character or 64 <= ord(character) <= 126:
+                return key
+
+    def last_top(self):
+        return max(len(self.cells) - self.height, 0)
+
+    def line_down(self):
+        """Scrolls one row down and draws the row coming into view."""
+        if self.top >= self.last_top():
+            return ''
+        self.top += 1
+        return self.image_writer.scroll_up() + self.draw(self.height - 1, self.height)
+
+    def line_up(self):
+        """Scrolls one row up and draws the row coming into view."""
+        if self.top == 0:
+            return ''
+        self.top -= 1
+        return self.image_writer.scroll_down() + self.draw(0, 1)
+
+    def page_down(self):
+        return self.go_to(self.top + self.height)
+
+    def page_up(self):
+        return self.go_to(self.top - self.height)
+
+    def bottom(self):
+        """Jumps to the typed line number or to the end without one."""
+        if self.count:
+            return self.jump()
+        return self.go_to(self.last_top())
+
+    def jump(self):
+        """Jumps to the typed line number or to the top without one."""
+        line = 1
+        if self.count:
+            line = int(self.count)
+        return self.go_to(line - 1)
+
+    def go_to(self, top):
+        """Shows the viewport starting at the requested row."""
+        top = min(max(top, 0), self.last_top())
+        if top == self.top:
+            return ''
+        self.top = top
+        return self.draw(0, self.height)
+
+    def draw(self, first, last):
+        """Draws the viewport lines from first up to last and the status."""
+        output = ''
+        for line in range(first, last):
+            output += self.image_writer.cursor_position(self.screen.origin['row'] + line,
+                                                        self.screen.origin['col'])
+            output += self.blank + self.image_writer.erase_line()
+            output += self.render_row(self.top + line)
+        return output + self.status()
+
+    def render_row(self, index):
+        """Returns the commands to print one row of cells."""
+        if index >= len(self.cells) or not self.cells[index]:
+            return ''
+        row = self.cells[index]
+        output = ''
+        color = self.blank
+        for col in range(max(row.keys()) + 1):
+            cell_color, char = row.get(col, (self.blank, ' '))
+            if cell_color != color:
+                output += cell_color
+                color = cell_color
+            output += char
+        return output + self.blank
+
+    def status(self):
+        """Returns the commands to print the position on the status line."""
+        last = min(self.top + self.height, len(self.cells))
+        message = "rows {}-{}/{}".format(self.top + 1, last, len(self.cells))
+        output = self.image_writer.cursor_position(self.status_row, 1)
+        output += self.blank + self.image_writer.erase_line() + message
+        return output
+
+
 class PositionReporter:
     """Check that terminal reports same cursor position as our tracking."""
 
@@ -509,18 +903,21 @@ class AnsiArtConverter(object):
         0x0e: 0x266b  #	BEAMED EIGHTH NOTES
     }
 
-    def __init__(self, source_ansi, output, screen, image_writer, palette_offset = 0, delay = 0):
+    def __init__(self, source_ansi, output, screen, image_writer, palette_offset = 0, delay = 0, checkpoints = None):
         """Sets the source and destination for the conversion."""
-        self._source_ansi = source_ansi
+        self._source_ansi = CountingInput(source_ansi)
         self._output = DelayedPrinter(output, delay)
         self.position_reporter = PositionReporter(self)
         self.terminalcommands = image_writer
         self.screen = screen
+        self.checkpoints = checkpoints
 
     def process(self, chars, stream):
         """Processes characters that are part of the ANSI art."""
         if ord(chars[0]) in self.printable_control_char_mapping: # TODO: move this to a more appropriate place.
             chars = unichr(self.printable_control_char_mapping[ord(chars[0])])
+            if self.screen.cells is not None:
+                self.screen.store(chars.encode('utf-8'))
             self.screen.cursor['col'] += 1
         elif chars[0] == '\x1b':
             chars += stream.read(1)
@@ -538,6 +935,8 @@ class AnsiArtConverter(object):
             output = ''
             if self.screen.cursor['row'] > self.screen.max_row:
                 output += self.screen.clear_rows()
+            if self.screen.cells is not None and chars not in "\r\n":
+                self.screen.store(chars.decode('cp437').encode('utf-8'))
             chars = self.screen.printable_character(chars)
             chars = output + chars.decode('cp437').encode('utf-8')
         self.logger.warn("row: {} col: {}".format(self.screen.cursor['row'],
@@ -555,9 +954,49 @@ class AnsiArtConverter(object):
             self.logger.warn("Non CSI escape code: {}".format(hex(ord(val))))
             return chars
 
-    def print_ansi(self):
+    def process_silently(self, end = None, row = None):
+        """Processes the input only to track the screen state.
+
+        Stops at the offset end or before anything is drawn on the row."""
+        while end is None or self._source_ansi.tell() < end:
+            if row is not None and (self.screen.cursor['row'] >= row or
+                                    self.screen.max_row >= row):
+                break
+            character = self._source_ansi.read(1)
+            # DOS EOF, after it comes SAUCE metadata.
+            if not character or character == '\x1a':
+                break
+            self.process(character, self._source_ansi)
+            if self.checkpoints:
+                self.checkpoints.record(self._source_ansi.tell(), self.screen)
+
+    def seek(self, offset = None, row = None):
+        """Resumes from the checkpoint nearest to the offset or row.
+
+        The rest of the way is then processed silently, from the current
+        input position if there is no checkpoint before it.
+        Returns the commands that move the terminal to the restored state."""
+        if offset is None and row is None:
+            return ''
+        checkpoint = None
+        if self.checkpoints:
+            checkpoint = self.checkpoints.nearest(offset, row)
+        if checkpoint:
+            self.screen.restore(checkpoint)
+            self._source_ansi.seek(checkpoint['offset'])
+        self.process_silently(offset, row)
+        output = self.terminalcommands.cursor_position(self.screen.cursor['row'],
+                                                       self.screen.cursor['col'])
+        output += self.terminalcommands.color(self.screen.current_color)
+        return output
+
+    def print_ansi(self, offset = 0, row = None):
         """Controls the printing of the ANSI art."""
         self._output.write(self.prepare_screen())
+        if self.checkpoints:
+            self.checkpoints.record(self._source_ansi.tell(), self.screen)
+        if offset or row:
+            self._output.write(self.seek(offset or None, row))
 
         tty.setcbreak(sys.stdin.fileno())
         while True:
@@ -568,6 +1007,8 @@ class AnsiArtConverter(object):
             if character == '\x1a':
                 break
             self._output.write(self.process(character, self._source_ansi))
+            if self.checkpoints:
+                self.checkpoints.record(self._source_ansi.tell(), self.screen)
 
             position = self.position_reporter.get_position_report()
             # this is bugged after processing newlines.
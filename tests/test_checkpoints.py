@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import logging
+import tempfile
+import unittest
+
+from ansi_art_converter.ansi_art_converter import (AnsiArtConverter,
+    ScreenCheckpoints, TerminalCommands, TerminalScreen)
+
+logging.disable(logging.CRITICAL)
+
+# Every line is 15 bytes long.
+ART = "".join("\x1b[1;3{}mRow {:02d}\r\n".format(i % 8, i) for i in range(40))
+
+
+class FakeScreen(object):
+    """Stands in for TerminalScreen when only max_row matters."""
+
+    def __init__(self, max_row):
+        self.max_row = max_row
+
+    def snapshot(self):
+        return {'max_row': self.max_row}
+
+
+class ScreenCheckpointsTest(unittest.TestCase):
+
+    def test_record_keeps_interval(self):
+        checkpoints = ScreenCheckpoints(10)
+        self.assertTrue(checkpoints.record(0, FakeScreen(1)))
+        self.assertFalse(checkpoints.record(5, FakeScreen(1)))
+        self.assertTrue(checkpoints.record(10, FakeScreen(2)))
+        self.assertFalse(checkpoints.record(10, FakeScreen(9)))
+        self.assertEqual(checkpoints.offsets, [0, 10])
+
+    def test_nearest_row_is_before_the_row_starts(self):
+        checkpoints = ScreenCheckpoints(1)
+        for offset, row in zip([0, 10, 20, 30, 40], [1, 3, 5, 5, 8]):
+            checkpoints.record(offset, FakeScreen(row))
+        self.assertEqual(checkpoints.nearest(row=5)['offset'], 10)
+        self.assertEqual(checkpoints.nearest(row=6)['offset'], 30)
+        self.assertEqual(checkpoints.nearest(row=1)['offset'], 0)
+        self.assertEqual(checkpoints.nearest(offset=25)['offset'], 20)
+        self.assertEqual(checkpoints.nearest(offset=-1), None)
+
+    def test_save_and_load(self):
+        checkpoints = ScreenCheckpoints(10)
+        checkpoints.record(0, FakeScreen(1))
+        checkpoints.record(12, FakeScreen(4))
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            checkpoints.save(path, 100)
+            loaded = ScreenCheckpoints()
+            self.assertFalse(loaded.load(path, 99))
+            self.assertTrue(loaded.load(path, 100))
+        finally:
+            os.remove(path)
+        self.assertEqual(loaded.offsets, [0, 12])
+        self.assertEqual(loaded.rows, [1, 4])
+
+
+class SeekTest(unittest.TestCase):
+
+    def converter(self, checkpoints = None):
+        image_writer = TerminalCommands(64)
+        screen = TerminalScreen(image_writer, {'row': 1, 'col': 1})
+        return AnsiArtConverter(io.BytesIO(ART), io.BytesIO(), screen,
+                                image_writer, 64, 0, checkpoints)
+
+    def indexed_converter(self):
+        converter = self.converter(ScreenCheckpoints(100))
+        converter.checkpoints.record(0, converter.screen)
+        converter.process_silently()
+        return converter
+
+    def test_seek_offset_is_exact(self):
+        converter = self.indexed_converter()
+        converter.seek(offset=15 * 25)
+        expected = self.converter()
+        expected.seek(offset=15 * 25)
+        self.assertEqual(converter._source_ansi.tell(), 15 * 25)
+        self.assertEqual(converter.screen.snapshot(), expected.screen.snapshot())
+
+    def test_seek_row_stops_before_the_row(self):
+        converter = self.indexed_converter()
+        converter.seek(row=20)
+        self.assertEqual(converter._source_ansi.tell(), 15 * 19)
+        self.assertEqual(converter.screen.cursor, {'row': 20, 'col': 1})
+        self.assertEqual(converter.screen.max_row, 19)
+
+
+if __name__ == '__main__':
+    unittest.main()
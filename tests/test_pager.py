@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import io
+import logging
+import unittest
+
+from ansi_art_converter.ansi_art_converter import (AnsiArtConverter, Pager,
+    TerminalCommands, TerminalScreen)
+
+logging.disable(logging.CRITICAL)
+
+
+class CellsTest(unittest.TestCase):
+
+    def cells(self, art):
+        image_writer = TerminalCommands(64)
+        screen = TerminalScreen(image_writer, {'row': 1, 'col': 1})
+        screen.cells = []
+        converter = AnsiArtConverter(io.BytesIO(art), io.BytesIO(), screen,
+                                     image_writer, 64, 0)
+        converter.process_silently()
+        return [''.join(row[col][1] for col in sorted(row)) for row in screen.cells]
+
+    def test_cells_are_kept(self):
+        self.assertEqual(self.cells("ab\r\ncd"), ['ab', 'cd'])
+
+    def test_erase_line_clears_the_row(self):
+        self.assertEqual(self.cells("ab\r\ncd\x1b[K"), ['ab', ''])
+
+    def test_erase_screen_clears_all_rows(self):
+        self.assertEqual(self.cells("ab\r\ncd\x1b[2Je"), ['', 'e'])
+
+    def test_backspace_deletes_the_previous_character(self):
+        self.assertEqual(self.cells("abc\x08"), ['ab'])
+
+
+class PagerKeysTest(unittest.TestCase):
+
+    def pager(self):
+        pager = Pager.__new__(Pager)
+        pager.cells = [{}] * 100
+        pager.height = 10
+        pager.top = 0
+        pager.count = ''
+        pager.draw = lambda first, last: ''
+        return pager
+
+    def test_count_before_G_jumps_to_line(self):
+        pager = self.pager()
+        pager.count = '42'
+        pager.bottom()
+        self.assertEqual(pager.top, 41)
+
+    def test_G_goes_to_the_end(self):
+        pager = self.pager()
+        pager.bottom()
+        self.assertEqual(pager.top, 90)
+
+
+if __name__ == '__main__':
+    unittest.main()